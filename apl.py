@@ -11,18 +11,47 @@ Improved Playwright crawler for Apple refurbished storefronts.
 
 import asyncio
 import argparse
+import hashlib
 import json
+import os
 import re
 import random
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from urllib.parse import urljoin, urlparse
-from typing import Set, List, Tuple, Optional, Dict
+from urllib.parse import urljoin, urlparse, urlunparse
+from typing import Set, Tuple, Optional, Dict
 
-from bs4 import BeautifulSoup
 from html import unescape
+from lxml import etree, html as lxml_html
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
-from asyncio import Semaphore
+
+try:
+    import orjson  # optional: much faster JSON-LD decoding and output writing
+except ImportError:
+    orjson = None
+
+try:
+    import uvloop  # optional: cheaper event-loop scheduling for the many concurrent fetches
+except ImportError:
+    uvloop = None
+
+if orjson is not None:
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+
+    def dump_output_json(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+else:
+    json_loads = json.loads
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    def dump_output_json(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
 
 # ---------- Defaults ----------
 DEFAULT_COUNTRY_START_URLS = {
@@ -39,22 +68,137 @@ DEFAULT_COUNTRY_START_URLS = {
     "IE": "https://www.apple.com/ie/shop/refurbished"
 }
 
+USER_AGENT = "Mozilla/5.0 (compatible; RefurbCrawler/1.0)"
 RANDOM_DELAY = (0.2, 1.0)
 PAGE_TIMEOUT = 30000
 PRODUCT_PAGE_TIMEOUT = 30000
+# A clickable "load more" responds quickly; don't sit out PAGE_TIMEOUT on one that won't
+EXPAND_CLICK_TIMEOUT = 5000
 CONCURRENT_PRODUCT_FETCHES = 6
+# Listing pages are only read for their links, so skip fetching these (stylesheets stay:
+# the "load more" buttons have to be laid out to be clicked). WebSockets never reach
+# route handlers; they are closed through route_web_socket instead.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+# Analytics/ad hosts the listing pages pull in; nothing we parse comes from them
+BLOCKED_URL_PARTS = ("doubleclick.net", "googletagmanager.com", "google-analytics.com",
+                     "omtrdc.net", "demdex.net", "everesttech.net")
+# Chromium flags for a headless crawl: no image decoding, no shm-size limits in containers
+BROWSER_ARGS = ["--disable-dev-shm-usage", "--blink-settings=imagesEnabled=false",
+                "--disable-background-networking"]
+# Product fetch retries on throttling / server errors, with exponential backoff
+FETCH_RETRIES = 3
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RETRY_BASE_DELAY = 1.0
+
+# Parsed products are cached per URL so re-runs skip fetching and parsing them again
+CACHE_DIR = Path.home() / ".cache" / "apl"
+CACHE_TTL = 24 * 3600
+# In-memory memo of parse results for identical product HTML (per process, FIFO eviction)
+PARSE_CACHE_SIZE = 512
+PARSE_CACHE_MIN_HTML = 4096
 
 DEFAULT_MAX_PAGES_PER_COUNTRY = 200
 DEFAULT_MAX_PRODUCTS_PER_COUNTRY = 1000
 MAX_BFS_DEPTH = 3
 
+# ---------- Precompiled patterns ----------
+# Inline-price patterns only ever run on a short window starting at their literal key
+PRICE_SCAN_WINDOW = 400
+_PRICE_RE = re.compile(r'"priceCurrency"\s*:\s*["\']([A-Z]{3})["\'].*?"price"\s*:\s*([0-9]+(?:\.[0-9]+)?)',
+                       re.IGNORECASE | re.DOTALL)
+_CURPRICE_RE = re.compile(r'"currentPrice"\s*:\s*\{[^}]*"raw_amount"\s*:\s*["\']([0-9\.]+)["\']')
+# canonical /shop/product/ paths are covered by /product/
+_PRODUCT_URL_RE = re.compile(r'/product/|/product-page|/A/[A-Z0-9]{5,}', re.IGNORECASE)
+_REFURB_TOKEN_RE = re.compile(r'/[A-Z0-9]{6,}')
+_MORE_TEXT_RE = re.compile(
+    r'load more|show more|mehr|more results|anzeigen|voir plus|voir plus de|'
+    r'carica altro|cargar más|cargar mas|zeige mehr|view more',
+    re.IGNORECASE)
+# Titles of localized "page not found" pages
+_ERROR_TITLE_RE = re.compile(r'page not found|page introuvable|no se encuentra|nicht gefunden', re.IGNORECASE)
+
+_RAM_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    # English patterns
+    r'(\d+)\s*GB\s+(?:unified\s+)?memory\b',
+    r'(\d+)\s*GB\s+(?:of\s+)?(?:unified\s+)?memory\b',
+    r'(\d+)\s*GB\s+RAM\b',
+    r'(\d+)\s*GB\s+(?:of\s+)?RAM\b',
+
+    # German patterns (like your sample)
+    r'(\d+)\s*GB\s+gemeinsamer\s+Arbeitsspeicher\b',
+    r'(\d+)\s*GB\s+Arbeitsspeicher\b',
+
+    # French patterns
+    r'(\d+)\s*Go\s+de\s+mémoire\s+unifiée\b',
+    r'(\d+)\s*Go\s+de\s+mémoire\b',
+
+    # Spanish patterns
+    r'(\d+)\s*GB\s+de\s+memoria\s+unificada\b',
+    r'(\d+)\s*GB\s+de\s+memoria\b',
+
+    # Italian patterns
+    r'(\d+)\s*GB\s+di\s+memoria\s+unificata\b',
+    r'(\d+)\s*GB\s+di\s+memoria\b',
+
+    # Dutch patterns
+    r'(\d+)\s*GB\s+(?:gedeeld\s+)?geheugen\b',
+
+    # General memory patterns
+    r'memory[:\s]*(\d+)\s*GB\b',
+    r'RAM[:\s]*(\d+)\s*GB\b',
+))
+
+_STORAGE_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    # English
+    r'(\d{1,4})\s*([GT])B\s+(?:of\s+)?(?:SSD|storage|Storage)\b',
+    r'(?:SSD|storage|Storage)[\s:]+(\d{1,4})\s*([GT])B\b',
+
+    # German (like your sample: "512 GB SSD Speicher")
+    r'(\d{1,4})\s*([GT])B\s+SSD\s+Speicher\b',
+    r'(\d{1,4})\s*([GT])B\s+Speicher\b',
+
+    # French
+    r'(\d{1,4})\s*([GT])o\s+(?:de\s+)?(?:SSD|stockage)\b',
+    r'(?:SSD|stockage)[\s:]+(?:de\s+)?(\d{1,4})\s*([GT])o\b',
+
+    # Spanish
+    r'(\d{1,4})\s*([GT])B\s+(?:de\s+)?(?:SSD|almacenamiento)\b',
+
+    # Italian
+    r'(\d{1,4})\s*([GT])B\s+(?:di\s+)?(?:SSD|archiviazione)\b',
+
+    # General pattern for large standalone numbers (likely storage)
+    r'\b(\d{3,4})\s*([GT])B\b(?!\s*(?:memory|Memory|RAM|mémoire|memoria|Arbeitsspeicher))',
+))
+
+# Product detail containers, in priority order; the first match of each contributes its text.
+DETAILS_SELECTORS = (
+    ".as-productinfo", ".product-hero", ".tech-specs", ".rb-content", ".product-hero__description",
+    ".section-copy", "#overview", ".description", ".rf-configuration-subheader",
+    ".rf-configuration-productsummary"
+)
+
+
+# The `.class` / `#id` selectors above, matched in a single walk over the tree: a
+# whitespace-delimited class token (as in CSS) or an exact id.
+_DETAILS_CLASS_RE = re.compile(r'(?<![^ \t\r\n])(%s)(?![^ \t\r\n])' % '|'.join(
+    re.escape(sel[1:]) for sel in DETAILS_SELECTORS if sel.startswith('.')))
+_DETAILS_IDS = frozenset(sel[1:] for sel in DETAILS_SELECTORS if sel.startswith('#'))
+# Visible text only: skip <script>/<style> bodies (comments are never text() nodes)
+_NODE_TEXT_XPATH = etree.XPath("descendant-or-self::text()[not(ancestor::script or ancestor::style)]")
+_LD_JSON_XPATH = etree.XPath("//script[contains(@type, 'ld+json')]")
+_CANONICAL_LINK_XPATH = etree.XPath("//link[@rel='canonical']/@href")
+_ITEMPROP_URL_XPATH = etree.XPath("//meta[@itemprop='url']/@content")
+_ANCHOR_HREF_XPATH = etree.XPath("//a/@href")
+_BASE_HREF_XPATH = etree.XPath("//base/@href")
+
 
 class AppleSpecDetector:
     """Enhanced Apple CPU and RAM detection with multilingual support and deduplication"""
     
     def __init__(self):
         # Valid Apple CPUs with their canonical names (no A26, A28 etc.)
-        self.valid_cpus = {
+        self.valid_cpus = frozenset({
             # A-series (iPhone/iPad)
             'A4', 'A5', 'A6', 'A7', 'A8', 'A9', 'A10', 'A10X', 
             'A11', 'A12', 'A12X', 'A12Z', 'A13', 'A14', 'A15', 
@@ -68,51 +212,43 @@ class AppleSpecDetector:
             
             # S-series (Watch) - SiP (System in Package)
             'S1', 'S2', 'S3', 'S4', 'S5', 'S6', 'S7', 'S8', 'S9', 'S10'
-        }
-        
-        self.cpu_patterns = self._create_cpu_patterns()
-        
-    def _create_cpu_patterns(self) -> List[Tuple[re.Pattern, str]]:
-        """Create regex patterns to match and normalize CPU names"""
-        patterns = []
+        })
         
-        for cpu in self.valid_cpus:
-            # Create patterns for different formats
-            pattern_variations = [
-                # "Apple M4 Chip", "Apple M4 chip", "AppleÂ M4Â Chip"
-                rf'Apple\s*(?:Â\s*)?{re.escape(cpu)}\s*(?:Â\s*)?\s*[Cc]hip',
-                # "M4 Chip", "M4 chip"  
-                rf'\b{re.escape(cpu)}\s+[Cc]hip\b',
-                # Just "M4", "A17", etc. with word boundaries
-                rf'\b{re.escape(cpu)}\b(?!\s*[Cc]hip)',
-            ]
-            
-            # Special handling for SiP (System in Package)
-            if cpu.startswith('S') and cpu[1:].isdigit():
-                pattern_variations.extend([
-                    rf'\b{re.escape(cpu)}\s+SiP\b',
-                    rf'\b{re.escape(cpu)}\s+SIP\b',
-                ])
-            
-            # Special handling for Bionic
-            if cpu.startswith('A') and len(cpu.replace(' Pro', '')) <= 3:
-                pattern_variations.append(rf'\b{re.escape(cpu)}\s+Bionic\b')
-            
-            for pattern_str in pattern_variations:
-                pattern = re.compile(pattern_str, re.IGNORECASE)
-                patterns.append((pattern, cpu))
-                
-        return patterns
+        self.cpu_pattern, self.cpu_names = self._create_cpu_pattern()
+        self.cpu_rank = {cpu: self._cpu_sort_key(cpu) for cpu in self.valid_cpus}
+
+    @staticmethod
+    def _cpu_sort_key(cpu: str) -> Tuple[int, int, int, str]:
+        """Smaller is better: M-series over A over S, then the newest generation, then the
+        most specific variant ("A18 Pro" over "A18", "M3 Max" over "M3"); the name keeps
+        the pick stable."""
+        family, generation = cpu[0], int(re.match(r'[A-Z](\d+)', cpu).group(1))
+        return ({'M': 0, 'A': 1}.get(family, 2), -generation, -len(cpu), cpu)
+
+    def _create_cpu_pattern(self) -> Tuple[re.Pattern, Dict[str, str]]:
+        """One alternation over every chip name plus a lowercase -> canonical name map.
+
+        Longest names come first so "M4 Pro" wins over "M4" at the same position.
+        "Apple M4 Chip" style mentions may have no word boundary after "Apple".
+        """
+        names = sorted(self.valid_cpus, key=lambda cpu: (-len(cpu), cpu))
+        alternation = '|'.join(re.escape(cpu) for cpu in names)
+        pattern = re.compile(rf'(?:\b|(?<=apple))({alternation})(?:\b|(?=chip))', re.IGNORECASE)
+        return pattern, {cpu.lower(): cpu for cpu in names}
     
     def detect_cpus(self, text: str) -> Set[str]:
         """Detect and normalize CPU names from text"""
         if not text:
             return set()
-            
+
+        # Handle special characters and normalize
+        normalized_text = text.replace('\xa0', ' ').replace('Â', ' ')
+
         detected_cpus = set()
-        
-        for pattern, canonical_name in self.cpu_patterns:
-            if pattern.search(text):
+
+        for match in self.cpu_pattern.finditer(normalized_text):
+            canonical_name = self.cpu_names.get(match.group(1).lower())
+            if canonical_name:
                 detected_cpus.add(canonical_name)
                 
         return detected_cpus
@@ -125,42 +261,10 @@ class AppleSpecDetector:
         # Handle special characters and normalize
         normalized_text = text.replace('\xa0', ' ').replace('Â', ' ')
         
-        ram_patterns = [
-            # English patterns
-            r'(\d+)\s*GB\s+(?:unified\s+)?memory\b',
-            r'(\d+)\s*GB\s+(?:of\s+)?(?:unified\s+)?memory\b',
-            r'(\d+)\s*GB\s+RAM\b',
-            r'(\d+)\s*GB\s+(?:of\s+)?RAM\b',
-            
-            # German patterns (like your sample)
-            r'(\d+)\s*GB\s+gemeinsamer\s+Arbeitsspeicher\b',
-            r'(\d+)\s*GB\s+Arbeitsspeicher\b',
-            
-            # French patterns
-            r'(\d+)\s*Go\s+de\s+mémoire\s+unifiée\b',
-            r'(\d+)\s*Go\s+de\s+mémoire\b',
-            
-            # Spanish patterns
-            r'(\d+)\s*GB\s+de\s+memoria\s+unificada\b',
-            r'(\d+)\s*GB\s+de\s+memoria\b',
-            
-            # Italian patterns
-            r'(\d+)\s*GB\s+di\s+memoria\s+unificata\b',
-            r'(\d+)\s*GB\s+di\s+memoria\b',
-            
-            # Dutch patterns
-            r'(\d+)\s*GB\s+(?:gedeeld\s+)?geheugen\b',
-            
-            # General memory patterns
-            r'memory[:\s]*(\d+)\s*GB\b',
-            r'RAM[:\s]*(\d+)\s*GB\b',
-        ]
-        
         detected_ram = set()
         
-        for pattern in ram_patterns:
-            matches = re.finditer(pattern, normalized_text, re.IGNORECASE)
-            for match in matches:
+        for pattern in _RAM_PATTERNS:
+            for match in pattern.finditer(normalized_text):
                 gb_value = int(match.group(1))
                 # Only accept realistic RAM values (4GB to 192GB for Apple devices)
                 if 4 <= gb_value <= 192:
@@ -174,59 +278,114 @@ spec_detector = AppleSpecDetector()
 
 
 # ---------- Parsing helpers ----------
-def extract_ld_json(html):
+def parse_html(html):
+    """Parse a page once into an lxml tree the helpers below can share; None if unparseable."""
+    try:
+        return lxml_html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        return None
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _iter_json_objects(s):
+    """Yield every top-level JSON object embedded in `s`, scanning left to right once."""
+    i = 0
+    n = len(s)
+    while i < n:
+        i = s.find('{', i)
+        if i < 0:
+            break
+        try:
+            obj, end = _JSON_DECODER.raw_decode(s, i)
+        except ValueError:
+            i += 1
+            continue
+        yield obj
+        i = end
+
+
+def extract_ld_json(doc):
+    if doc is None:
+        return []
     blocks = []
-    for m in re.finditer(r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>',
-                         html, flags=re.DOTALL | re.IGNORECASE):
-        content = unescape(m.group(1).strip())
+    for node in _LD_JSON_XPATH(doc):
+        content = unescape((node.text or '').strip())
         try:
-            obj = json.loads(content)
+            obj = json_loads(content)
             blocks.append(obj)
             continue
         except Exception:
-            candidates = re.findall(r'(\{(?:[^{}]|(?1))*\})', content)
-            for c in candidates:
-                try:
-                    blocks.append(json.loads(c))
-                except Exception:
-                    pass
+            # malformed block (trailing junk, several objects, ...): salvage the valid objects
+            blocks.extend(_iter_json_objects(content))
     return blocks
 
 
-def meta_tag(html, name=None, prop=None):
-    if prop:
-        m = re.search(r'<meta[^>]+property=["\']%s["\'][^>]*content=["\']([^"\']*)' % re.escape(prop),
-                      html, flags=re.IGNORECASE)
-        if m:
-            return unescape(m.group(1).strip())
-    if name:
-        m = re.search(r'<meta[^>]+name=["\']%s["\'][^>]*content=["\']([^"\']*)' % re.escape(name),
-                      html, flags=re.IGNORECASE)
-        if m:
-            return unescape(m.group(1).strip())
+def _first_attr(values):
+    for v in values:
+        v = v.strip()
+        if v:
+            return v
     return None
 
 
-def get_canonical(html):
+def read_meta(doc) -> Dict[Tuple[str, str], str]:
+    """Collect <meta property/name> contents in one tree walk, keyed by (attribute, key).
+
+    The first non-empty content wins, as with a per-key lookup in document order.
+    """
+    meta = {}
+    if doc is None:
+        return meta
+    for el in doc.iter('meta'):
+        content = (el.get('content') or '').strip()
+        if not content:
+            continue
+        for attr in ('property', 'name'):
+            key = el.get(attr)
+            if key:
+                meta.setdefault((attr, key), content)
+    return meta
+
+
+def meta_tag(meta, name=None, prop=None):
+    return ((prop and meta.get(('property', prop))) or
+            (name and meta.get(('name', name))) or None)
+
+
+def get_canonical(doc, meta=None):
     # try og:url, then link rel=canonical, then <meta itemprop="url">
-    og = meta_tag(html, prop='og:url')
+    if meta is None:
+        meta = read_meta(doc)
+    og = meta_tag(meta, prop='og:url')
     if og:
         return og.split('#')[0].rstrip('/')
-    m = re.search(r'<link[^>]+rel=["\']canonical["\'][^>]*href=["\']([^"\']+)["\']', html, flags=re.IGNORECASE)
-    if m:
-        return m.group(1).split('#')[0].rstrip('/')
-    item = re.search(r'<meta[^>]+itemprop=["\']url["\'][^>]*content=["\']([^"\']+)["\']', html, flags=re.IGNORECASE)
-    if item:
-        return item.group(1).split('#')[0].rstrip('/')
+    if doc is None:
+        return None
+    href = _first_attr(_CANONICAL_LINK_XPATH(doc)) or _first_attr(_ITEMPROP_URL_XPATH(doc))
+    if href:
+        return href.split('#')[0].rstrip('/')
     return None
 
 
+def _ld_types(block) -> Tuple[str, ...]:
+    """Lowercased @type values of a JSON-LD block; @type may be a string or a list."""
+    t = block.get('@type')
+    if t == 'Product':
+        return ('product',)
+    if isinstance(t, str):
+        return (t.lower(),)
+    if isinstance(t, list):
+        return tuple(x.lower() for x in t if isinstance(x, str))
+    return ()
+
+
 def find_first_image_from_imagegallery(blocks):
     for b in blocks:
         if not isinstance(b, dict):
             continue
-        btype = (b.get('@type') or '').lower()
-        if btype == 'imagegallery' or b.get('associatedMedia'):
+        if 'imagegallery' in _ld_types(b) or b.get('associatedMedia'):
             am = b.get('associatedMedia') or []
             if isinstance(am, list) and am:
                 first = am[0]
@@ -239,13 +398,12 @@ def find_product_block(blocks):
     for b in blocks:
         if not isinstance(b, dict):
             continue
-        t = (b.get('@type') or '').lower()
-        if t == 'product' or t.endswith('product'):
+        if any(t.endswith('product') for t in _ld_types(b)):
             return b
     for b in blocks:
         if isinstance(b, dict):
             for v in b.values():
-                if isinstance(v, dict) and (v.get('@type') or '').lower() == 'product':
+                if isinstance(v, dict) and 'product' in _ld_types(v):
                     return v
     return None
 
@@ -260,20 +418,32 @@ def extract_price_from_product(prod):
     return None, None
 
 
-def extract_details_text(html):
-    soup = BeautifulSoup(html, "lxml")
+def _node_text(node):
+    return " ".join(t.strip() for t in _NODE_TEXT_XPATH(node) if t.strip())
+
+
+def _details_nodes(doc):
+    """First element matching each DETAILS_SELECTORS entry, in selector order."""
+    first = {}
+    for el in doc.iter(etree.Element):
+        cls = el.get('class')
+        if cls:
+            for m in _DETAILS_CLASS_RE.finditer(cls):
+                first.setdefault('.' + m.group(1), el)
+        el_id = el.get('id')
+        if el_id in _DETAILS_IDS:
+            first.setdefault('#' + el_id, el)
+    return [first[sel] for sel in DETAILS_SELECTORS if sel in first]
+
+
+def extract_details_text(doc, meta=None):
     texts = []
-    selectors = [
-        ".as-productinfo", ".product-hero", ".tech-specs", ".rb-content", ".product-hero__description",
-        ".section-copy", "#overview", ".description", ".rf-configuration-subheader",
-        ".rf-configuration-productsummary"
-    ]
-    for sel in selectors:
-        node = soup.select_one(sel)
-        if node:
-            texts.append(node.get_text(" ", strip=True))
+    if doc is not None:
+        texts = [_node_text(node) for node in _details_nodes(doc)]
     if not texts:
-        desc = meta_tag(html, name='description') or meta_tag(html, prop='og:description')
+        if meta is None:
+            meta = read_meta(doc)
+        desc = meta_tag(meta, name='description') or meta_tag(meta, prop='og:description')
         if desc:
             texts.append(desc)
     return "\n".join(texts).strip()
@@ -355,31 +525,8 @@ def detect_storage(text: str) -> Optional[str]:
     # Normalize text
     normalized_text = text.replace('\xa0', ' ').replace('Â', ' ')
     
-    storage_patterns = [
-        # English
-        r'(\d{1,4})\s*([GT])B\s+(?:of\s+)?(?:SSD|storage|Storage)\b',
-        r'(?:SSD|storage|Storage)[\s:]+(\d{1,4})\s*([GT])B\b',
-        
-        # German (like your sample: "512 GB SSD Speicher")
-        r'(\d{1,4})\s*([GT])B\s+SSD\s+Speicher\b',
-        r'(\d{1,4})\s*([GT])B\s+Speicher\b',
-        
-        # French
-        r'(\d{1,4})\s*([GT])o\s+(?:de\s+)?(?:SSD|stockage)\b',
-        r'(?:SSD|stockage)[\s:]+(?:de\s+)?(\d{1,4})\s*([GT])o\b',
-        
-        # Spanish
-        r'(\d{1,4})\s*([GT])B\s+(?:de\s+)?(?:SSD|almacenamiento)\b',
-        
-        # Italian
-        r'(\d{1,4})\s*([GT])B\s+(?:di\s+)?(?:SSD|archiviazione)\b',
-        
-        # General pattern for large standalone numbers (likely storage)
-        r'\b(\d{3,4})\s*([GT])B\b(?!\s*(?:memory|Memory|RAM|mémoire|memoria|Arbeitsspeicher))',
-    ]
-    
-    for pattern in storage_patterns:
-        match = re.search(pattern, normalized_text, re.IGNORECASE)
+    for pattern in _STORAGE_PATTERNS:
+        match = pattern.search(normalized_text)
         if match:
             size_num = int(match.group(1))
             unit = match.group(2).upper()
@@ -408,20 +555,12 @@ def find_ram_storage_chip(text: str, title: str = None):
     
     # Take the first/best CPU and RAM
     if detected_cpus:
-        # Prefer M-series over others, then by recency
-        cpu_list = sorted(detected_cpus, key=lambda x: (
-            0 if x.startswith('M4') else
-            1 if x.startswith('M3') else
-            2 if x.startswith('M2') else
-            3 if x.startswith('M1') else
-            4 if x.startswith('A') else 5
-        ))
-        res['chip'] = cpu_list[0]
+        # Prefer M-series over others, then by recency (precomputed rank table)
+        res['chip'] = min(detected_cpus, key=spec_detector.cpu_rank.__getitem__)
     
     if detected_ram:
         # Take the largest RAM size if multiple found
-        ram_list = sorted(detected_ram, key=lambda x: int(x.replace('GB', '')), reverse=True)
-        res['ram'] = ram_list[0]
+        res['ram'] = max((int(x[:-2]), x) for x in detected_ram)[1]
     
     # Use separate storage detection
     storage = detect_storage(combined_text)
@@ -435,16 +574,80 @@ def find_ram_storage_chip(text: str, title: str = None):
     return res
 
 
-def parse_product_page_html(html, source_url=None):
-    """Parse fields and return dict including 'is_product' boolean and category."""
-    blocks = extract_ld_json(html)
+def _scan_after_token(html, token, pattern):
+    """Match `pattern` (which starts with `token`) in a short window at each occurrence of `token`."""
+    i = html.find(token)
+    while i >= 0:
+        m = pattern.match(html, i, i + PRICE_SCAN_WINDOW)
+        if m:
+            return m
+        i = html.find(token, i + 1)
+    return None
+
+
+_parse_cache: Dict[Tuple[bytes, Optional[str]], Dict] = {}
+
+
+def parse_product_page_html(html, source_url=None, doc=None, meta=None):
+    """Parse fields and return dict including 'is_product' boolean and category.
+
+    `doc` is the page's parse_html() tree (and `meta` its read_meta() map) when
+    the caller already has one; the HTML is parsed once and every DOM helper
+    reads from that tree. Results for identical HTML and source_url are
+    memoized, so variants and redirects that serve the same page are only
+    parsed once.
+    """
+    key = None
+    if len(html) > PARSE_CACHE_MIN_HTML:
+        key = (hashlib.blake2b(html.encode('utf-8', 'ignore'), digest_size=16).digest(), source_url)
+        cached = _parse_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+    parsed = _parse_product_page_html(html, source_url, doc, meta)
+    if key is not None:
+        if len(_parse_cache) >= PARSE_CACHE_SIZE:
+            del _parse_cache[next(iter(_parse_cache))]
+        _parse_cache[key] = dict(parsed)
+    return parsed
+
+
+def _parse_product_page_html(html, source_url, doc, meta):
+    if doc is None:
+        doc = parse_html(html)
+    if meta is None:
+        meta = read_meta(doc)
+    blocks = extract_ld_json(doc)
     prod_block = find_product_block(blocks)
+    og_type = meta_tag(meta, prop='og:type')
+
+    # Fast exit for listing/marketing pages: without a JSON-LD Product, an inline price,
+    # an og "product" type or an og:image (which together with specs makes a product,
+    # see below) nothing can make this a product, so skip the detail-text and spec
+    # extraction.
+    if (prod_block is None and '"priceCurrency"' not in html and '"currentPrice"' not in html
+            and not (og_type and 'product' in og_type.lower())
+            and not meta_tag(meta, prop='og:image')):
+        title = meta_tag(meta, prop='og:title') or meta_tag(meta, name='title') or source_url
+        return {
+            "title": (title.strip() if title else None),
+            "category": detect_product_category(title, source_url),
+            "price": None,
+            "currency": None,
+            "ram": None,
+            "storage": None,
+            "chip": None,
+            "additional_details": "",
+            "image": None,
+            "source_url": source_url,
+            "is_product": False
+        }
+
     title = None
     price = None
     currency = None
     image = None
     description = None
-    additional_details = extract_details_text(html)
+    additional_details = extract_details_text(doc, meta)
 
     if prod_block:
         title = prod_block.get('name') or prod_block.get('headline')
@@ -453,14 +656,13 @@ def parse_product_page_html(html, source_url=None):
         if isinstance(image, list):
             image = image[0]
         if not image:
-            image = find_first_image_from_imagegallery(blocks) or meta_tag(html, prop='og:image')
-        description = prod_block.get('description') or meta_tag(html, prop='og:description') or meta_tag(html, name='description')
+            image = find_first_image_from_imagegallery(blocks) or meta_tag(meta, prop='og:image')
+        description = prod_block.get('description') or meta_tag(meta, prop='og:description') or meta_tag(meta, name='description')
     else:
-        title = meta_tag(html, prop='og:title') or meta_tag(html, name='title') or source_url
-        image = meta_tag(html, prop='og:image')
-        description = meta_tag(html, prop='og:description') or meta_tag(html, name='description')
-        mprice = re.search(r'"priceCurrency"\s*:\s*["\']([A-Z]{3})["\'].*?"price"\s*:\s*([0-9]+(?:\.[0-9]+)?)',
-                           html, flags=re.IGNORECASE | re.DOTALL)
+        title = meta_tag(meta, prop='og:title') or meta_tag(meta, name='title') or source_url
+        image = meta_tag(meta, prop='og:image')
+        description = meta_tag(meta, prop='og:description') or meta_tag(meta, name='description')
+        mprice = _scan_after_token(html, '"priceCurrency"', _PRICE_RE)
         if mprice:
             currency = mprice.group(1)
             try:
@@ -468,7 +670,7 @@ def parse_product_page_html(html, source_url=None):
             except:
                 price = mprice.group(2)
         else:
-            mcur = re.search(r'"currentPrice"\s*:\s*\{[^}]*"raw_amount"\s*:\s*["\']([0-9\.]+)["\']', html)
+            mcur = _scan_after_token(html, '"currentPrice"', _CURPRICE_RE)
             if mcur:
                 try:
                     price = float(mcur.group(1))
@@ -490,13 +692,11 @@ def parse_product_page_html(html, source_url=None):
         is_product = True
     elif image and (specs['storage'] or specs['chip'] or specs['ram']):
         is_product = True
-    else:
-        og_type = meta_tag(html, prop='og:type')
-        if og_type and 'product' in og_type.lower():
-            is_product = True
+    elif og_type and 'product' in og_type.lower():
+        is_product = True
     
     # Don't treat error pages as products
-    if title and any(x in title.lower() for x in ['page not found', 'page introuvable', 'no se encuentra', 'nicht gefunden']):
+    if title and _ERROR_TITLE_RE.search(title):
         is_product = False
 
     parsed = {
@@ -516,293 +716,485 @@ def parse_product_page_html(html, source_url=None):
 
 
 # ---------- Link discovery & heuristics ----------
+@lru_cache(maxsize=8192)
 def looks_like_product_url(url: str) -> bool:
     """Strong product URL heuristics: canonical /shop/product/ or product-id segments."""
-    if re.search(r'/shop/product/', url, flags=re.IGNORECASE):
-        return True
-    if re.search(r'/product/|/product-page|/A/[A-Z0-9]{5,}', url, flags=re.IGNORECASE):
+    if _PRODUCT_URL_RE.search(url):
         return True
     # Accept refurbished links that embed an uppercase product token or fnode param conservatively
-    if '/shop/refurbished/' in url and ('?fnode=' in url or re.search(r'/[A-Z0-9]{6,}', url)):
-        return True
-    return False
+    return '/shop/refurbished/' in url and ('?fnode=' in url or _REFURB_TOKEN_RE.search(url) is not None)
+
+
+def product_url_key(url: str) -> str:
+    """Structural identity of a product link, used to fetch each product once.
+
+    Tracking/locale query strings are dropped when the path alone identifies the
+    product; `?fnode=` style links keep their query since it is what makes them unique.
+    """
+    p = urlparse(url)
+    bare = urlunparse((p.scheme, p.netloc.lower(), p.path.rstrip('/'), '', '', ''))
+    if not p.query or looks_like_product_url(bare):
+        return bare
+    return urlunparse((p.scheme, p.netloc.lower(), p.path.rstrip('/'), '', p.query, ''))
+
+
+@lru_cache(maxsize=4096)
+def url_netloc(url: str) -> str:
+    # the same links show up on many listing pages; urlsplit's own cache only holds 128
+    return urlparse(url).netloc
+
+
+def page_links(html, page_url, doc=None):
+    """Anchor hrefs (resolved as the browser's a.href would be) and JSON-LD URLs of a page.
+
+    Pool-friendly; returns (hrefs, ld_urls).
+    """
+    if doc is None:
+        doc = parse_html(html)
+    if doc is None:
+        return [], []
+    base_href = _first_attr(_BASE_HREF_XPATH(doc))
+    base = urljoin(page_url, base_href) if base_href else page_url
+    hrefs = []
+    for h in _ANCHOR_HREF_XPATH(doc):
+        h = h.strip()
+        if h and not h.startswith(('javascript:', '#')):
+            hrefs.append(urljoin(base, h))
+    ld_urls = []
+    for b in extract_ld_json(doc):
+        if isinstance(b, dict):
+            u = b.get('url') or b.get('@id') or b.get('mainEntityOfPage')
+            if isinstance(u, str):
+                ld_urls.append(u)
+    return hrefs, ld_urls
 
 
-async def discover_links_on_page(page, base_url):
-    """Return same-origin normalized links found on the page."""
+async def run_parse(parse_pool, fn, *args):
+    """Run a pure parse helper in `parse_pool` when one is given, inline otherwise."""
+    if parse_pool is None:
+        return fn(*args)
+    return await asyncio.get_running_loop().run_in_executor(parse_pool, fn, *args)
+
+
+def same_origin_links(hrefs, ld_urls, base_url):
+    """Normalize page_links() output to a set of fragment-free links on base_url's host."""
     urls = set()
-    anchors = await page.query_selector_all("a[href]")
-    for a in anchors:
-        try:
-            href = await a.get_attribute("href")
-            if not href or href.startswith("javascript:") or href.startswith("#"):
-                continue
-            full = urljoin(base_url, href)
-            # same host only
-            if urlparse(full).netloc != urlparse(base_url).netloc:
-                continue
-            urls.add(full.split('#')[0].rstrip('/'))
-        except Exception:
+    base_netloc = url_netloc(base_url)
+    for href in hrefs:
+        # same host only
+        if url_netloc(href) != base_netloc:
             continue
+        urls.add(href.split('#')[0].rstrip('/'))
+    for u in ld_urls:
+        urls.add(u.split('#')[0].rstrip('/'))
+    return urls
 
-    content = await page.content()
-    blocks = extract_ld_json(content)
-    for b in blocks:
-        if isinstance(b, dict):
-            u = b.get('url') or b.get('@id') or b.get('mainEntityOfPage')
-            if isinstance(u, str):
-                urls.add(u.split('#')[0].rstrip('/'))
 
-    return urls
+async def discover_links_on_page(page, base_url, parse_pool=None):
+    """Return same-origin normalized links found on the page.
+
+    Anchors and JSON-LD URLs are both read from one serialization of the live DOM,
+    so call this after the page has rendered (see try_expand_listing).
+    """
+    content = await page.content()
+    hrefs, ld_urls = await run_parse(parse_pool, page_links, content, page.url or base_url)
+    return same_origin_links(hrefs, ld_urls, base_url)
 
 
 # ---------- Validate & parse (single fetch) ----------
-async def fetch_and_validate_parse(semaphore: Semaphore, browser, url: str, verbose=False):
-    """Fetch the candidate URL, parse and validate it."""
-    async with semaphore:
-        context = await browser.new_context(user_agent="Mozilla/5.0 (compatible; RefurbCrawler/1.0)")
-        page = await context.new_page()
+async def open_context_pool(browser, size: int):
+    """Create `size` long-lived browser contexts and hand them out through a queue."""
+    contexts = [await browser.new_context(user_agent=USER_AGENT) for _ in range(size)]
+    pool = asyncio.Queue()
+    for ctx in contexts:
+        pool.put_nowait(ctx)
+    return pool, contexts
+
+
+async def close_context_pool(contexts):
+    for ctx in contexts:
         try:
-            await page.goto(url, timeout=PRODUCT_PAGE_TIMEOUT)
-            await asyncio.sleep(random.uniform(*RANDOM_DELAY))
-            html = await page.content()
-            canonical = get_canonical(html)
-            # choose validation URL: prefer canonical if it's product-like
-            validate_url = url
-            if canonical and looks_like_product_url(canonical):
-                validate_url = canonical
-            parsed = parse_product_page_html(html, source_url=validate_url)
-            if parsed and parsed.get("is_product"):
-                parsed.pop("is_product", None)
-                # if canonical exists and looks product-like, set source_url to canonical
-                if canonical and looks_like_product_url(canonical):
-                    parsed['source_url'] = canonical
-                else:
-                    parsed['source_url'] = url
-                if verbose:
-                    print(json.dumps(parsed, ensure_ascii=False))
-                await page.close()
-                await context.close()
-                return parsed
-            else:
-                if verbose:
-                    print(f"  - skipping non-product: {url} (canonical: {canonical})")
-                await page.close()
-                await context.close()
+            await ctx.close()
+        except Exception:
+            pass
+
+
+async def fetch_html(context, url: str) -> Optional[str]:
+    """GET `url` with the context's HTTP client (no rendering), backing off on 429/5xx.
+
+    Returns the response body, or None for a non-OK final response.
+    """
+    delay = RETRY_BASE_DELAY
+    for attempt in range(FETCH_RETRIES + 1):
+        resp = await context.request.get(url, timeout=PRODUCT_PAGE_TIMEOUT)
+        try:
+            if resp.status in RETRY_STATUSES and attempt < FETCH_RETRIES:
+                retry_after = resp.headers.get('retry-after', '')
+                wait = float(retry_after) if retry_after.isdigit() else delay
+                await asyncio.sleep(wait + random.uniform(*RANDOM_DELAY))
+                delay *= 2
+                continue
+            if not resp.ok:
                 return None
-        except Exception as e:
+            return await resp.text()
+        finally:
+            await resp.dispose()
+    return None
+
+
+def parse_candidate_html(html, url, product_like_only=False, doc=None):
+    """Validate a fetched candidate page; returns (parsed product or None, canonical).
+
+    With `product_like_only` the page is only parsed as a product when its URL or
+    canonical looks product-like. Pure and top-level so it can run in the parse
+    worker pool.
+    """
+    if doc is None:
+        doc = parse_html(html)
+    meta = read_meta(doc)
+    canonical = get_canonical(doc, meta)
+    if product_like_only and not (looks_like_product_url(url) or (canonical and looks_like_product_url(canonical))):
+        return None, canonical
+    # choose validation URL: prefer canonical if it's product-like
+    validate_url = url
+    if canonical and looks_like_product_url(canonical):
+        validate_url = canonical
+    parsed = parse_product_page_html(html, source_url=validate_url, doc=doc, meta=meta)
+    if parsed and parsed.get("is_product"):
+        parsed.pop("is_product", None)
+        # if canonical exists and looks product-like, set source_url to canonical
+        if canonical and looks_like_product_url(canonical):
+            parsed['source_url'] = canonical
+        else:
+            parsed['source_url'] = url
+        return parsed, canonical
+    return None, canonical
+
+
+def parse_bfs_page(html, url, page_url):
+    """parse_candidate_html plus, for listing pages, page_links from the same tree.
+
+    Returns (parsed, canonical, (hrefs, ld_urls)); one parse and one trip to the
+    worker pool per BFS page.
+    """
+    doc = parse_html(html)
+    parsed, canonical = parse_candidate_html(html, url, True, doc)
+    if parsed or (canonical and looks_like_product_url(canonical)):
+        return parsed, canonical, ([], [])
+    return parsed, canonical, page_links(html, page_url, doc)
+
+
+# ---------- Product cache ----------
+def _cache_path(cache_dir: Path, url: str) -> Path:
+    return cache_dir / f"{hashlib.blake2b(url.encode('utf-8'), digest_size=8).hexdigest()}.json"
+
+
+def load_cached_product(cache_dir: Optional[Path], url: str) -> Optional[Dict]:
+    """Return the parsed product cached for `url` if it is younger than CACHE_TTL.
+
+    Entries that don't decode to a product dict (hand-edited or foreign files) are misses.
+    """
+    if cache_dir is None:
+        return None
+    path = _cache_path(cache_dir, url)
+    try:
+        if time.time() - path.stat().st_mtime < CACHE_TTL:
+            cached = json_loads(path.read_bytes())
+            if isinstance(cached, dict) and cached.get('source_url'):
+                return cached
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def store_cached_product(cache_dir: Optional[Path], url: str, parsed: Dict):
+    if cache_dir is None:
+        return
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        _cache_path(cache_dir, url).write_bytes(json_dumps(parsed))
+    except OSError:
+        pass
+
+
+async def fetch_and_validate_parse(context_pool: asyncio.Queue, url: str, parse_pool=None, verbose=False,
+                                   cache_dir=None):
+    """Fetch the candidate URL's HTML on a pooled context, parse and validate it.
+
+    Product pages carry their JSON-LD and meta tags in the server response, so
+    no page is rendered here. Parsing runs in `parse_pool` when given, keeping
+    the event loop free for other fetches. Products found in `cache_dir` are
+    returned without touching the network.
+    """
+    cached = load_cached_product(cache_dir, url)
+    if cached is not None:
+        if verbose:
+            print(json.dumps(cached, ensure_ascii=False))
+        return cached
+
+    # jitter between requests, before taking a context so idle waits don't hold a pool slot
+    await asyncio.sleep(random.uniform(*RANDOM_DELAY))
+    context = await context_pool.get()
+    try:
+        html = await fetch_html(context, url)
+        if html is None:
             if verbose:
-                print(f"  ! failed validating: {url} -> {e}")
-            try:
-                await page.close()
-            except Exception:
-                pass
-            try:
-                await context.close()
-            except Exception:
-                pass
+                print(f"  - skipping unavailable: {url}")
             return None
+        parsed, canonical = await run_parse(parse_pool, parse_candidate_html, html, url)
+        if parsed:
+            if verbose:
+                print(json.dumps(parsed, ensure_ascii=False))
+            store_cached_product(cache_dir, url, parsed)
+            return parsed
+        else:
+            if verbose:
+                print(f"  - skipping non-product: {url} (canonical: {canonical})")
+            return None
+    except Exception as e:
+        if verbose:
+            print(f"  ! failed validating: {url} -> {e}")
+        return None
+    finally:
+        context_pool.put_nowait(context)
 
 
 # ---------- BFS crawler ----------
+async def block_heavy_resources(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(part in request.url for part in BLOCKED_URL_PARTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def close_web_socket(ws):
+    # never connected to the server, so the page just sees the socket close
+    await ws.close()
+
+
+async def open_listing_context(browser):
+    """Context for rendering listing pages, with heavy resources and WebSockets blocked."""
+    ctx = await browser.new_context()
+    await ctx.route("**/*", block_heavy_resources)
+    await ctx.route_web_socket("**/*", close_web_socket)
+    return ctx
+
+
 async def try_expand_listing(page):
-    clicked_any = False
-    more_text_patterns = [
-        r'load more', r'show more', r'mehr', r'more results', r'anzeigen', r'voir plus', r'voir plus de',
-        r'carica altro', r'cargar más', r'cargar mas', r'zeige mehr', r'view more'
-    ]
+    """Click "load more" until it's gone, then scroll to let lazy tiles load.
+
+    Returns True when the DOM may have changed since the page loaded (a click or the
+    scroll ran), i.e. an earlier page.content() snapshot is stale.
+    """
+    changed = False
+    # the "load more" label is matched in the browser, across all buttons at once; hidden or
+    # disabled matches (e.g. a footer "Mehr erfahren" disclosure) must not shadow the real one
+    more_button = page.locator("button:enabled").filter(has_text=_MORE_TEXT_RE).filter(visible=True).first
     try:
         for _ in range(6):
-            btn = await page.query_selector("button:has-text('Load more'), button:has-text('Show more'), button:has-text('Mehr')")
-            if btn:
-                try:
-                    await btn.scroll_into_view_if_needed()
-                    await btn.click(timeout=PAGE_TIMEOUT)
-                    clicked_any = True
+            try:
+                if await more_button.count():
+                    # locator clicks scroll the element into view themselves
+                    await more_button.click(timeout=EXPAND_CLICK_TIMEOUT)
+                    changed = True
                     await asyncio.sleep(random.uniform(*RANDOM_DELAY))
                     continue
-                except Exception:
-                    pass
-            buttons = await page.query_selector_all("button")
-            found = False
-            for b in buttons:
-                try:
-                    txt = (await b.inner_text()).strip().lower()
-                    for pat in more_text_patterns:
-                        if re.search(pat, txt, flags=re.IGNORECASE):
-                            await b.scroll_into_view_if_needed()
-                            await b.click(timeout=PAGE_TIMEOUT)
-                            clicked_any = True
-                            found = True
-                            await asyncio.sleep(random.uniform(*RANDOM_DELAY))
-                            break
-                    if found:
-                        break
-                except Exception:
-                    continue
-            if not found:
-                await page.evaluate("() => window.scrollBy(0, document.body.scrollHeight)")
-                await asyncio.sleep(0.8)
-                break
+            except Exception:
+                pass
+            await page.evaluate("() => window.scrollBy(0, document.body.scrollHeight)")
+            changed = True
+            await asyncio.sleep(0.8)
+            break
     except PlaywrightTimeoutError:
         pass
     except Exception:
         pass
-    return clicked_any
+    return changed
 
 
-async def crawl_country_bfs(country_tag, start_url, browser, max_per_country=0, max_pages=0, verbose=False):
+async def crawl_country_bfs(country_tag, start_url, browser, max_per_country=0, max_pages=0, verbose=False,
+                            parse_pool=None, context_pool=None, cache_dir=None, listing_context=None):
     print(f"[+] {country_tag} -> {start_url}")
-    page = await browser.new_page()
+    # a shared listing context keeps the browser's connections to the store warm across
+    # countries; otherwise open one for this crawl
+    own_listing_context = None
+    if listing_context is None:
+        listing_context = own_listing_context = await open_listing_context(browser)
+    # listing pages are visited one at a time, so the whole BFS reuses one page
+    page = await listing_context.new_page()
     try:
-        await page.goto(start_url, timeout=PAGE_TIMEOUT)
+        await page.goto(start_url, timeout=PAGE_TIMEOUT, wait_until="domcontentloaded")
         await asyncio.sleep(random.uniform(*RANDOM_DELAY))
     except Exception as e:
         print(f"  ! failed to open start page: {e}")
-        try:
-            await page.close()
-        except:
-            pass
+        await page.close()
+        if own_listing_context:
+            await own_listing_context.close()
         return []
 
     # expand and seed only category links under /shop/refurbished/
     await try_expand_listing(page)
-    initial_links = await discover_links_on_page(page, start_url)
-    await page.close()
+    initial_links = await discover_links_on_page(page, start_url, parse_pool=parse_pool)
 
     category_links = [u for u in initial_links
                       if '/shop/refurbished/' in u and u.rstrip('/') != start_url.rstrip('/')]
+    # listing URLs are marked seen when queued, so the frontier never holds duplicates
+    seen = {start_url.rstrip('/')}
     if not category_links:
-        queue = [(start_url.rstrip('/'), 1)]
+        queue = deque([(start_url.rstrip('/'), 1)])
     else:
-        queue = [(u.rstrip('/'), 1) for u in category_links]
-
-    visited = set()
+        queue = deque()
+        for u in category_links:
+            u = u.rstrip('/')
+            if u not in seen:
+                seen.add(u)
+                queue.append((u, 1))
+
+    start_netloc = url_netloc(start_url)
+    seen_content = set()
+    scheduled_products = set()
     results = []
+    seen_sources = set()
     pages_visited = 0
-    sem = Semaphore(CONCURRENT_PRODUCT_FETCHES)
-    product_tasks = []
 
     max_products_cap = max_per_country or DEFAULT_MAX_PRODUCTS_PER_COUNTRY
     max_pages_cap = max_pages or DEFAULT_MAX_PAGES_PER_COUNTRY
 
-    while queue and len(results) < max_products_cap and pages_visited < max_pages_cap:
-        url, depth = queue.pop(0)
-        if url in visited:
-            continue
-        visited.add(url)
+    # a shared pool keeps connections warm across countries; otherwise open one for this crawl
+    own_contexts = None
+    if context_pool is None:
+        context_pool, own_contexts = await open_context_pool(browser, CONCURRENT_PRODUCT_FETCHES)
+
+    def add_result(parsed):
+        # dedupe on insert, so the product cap counts unique products; error pages were
+        # already rejected by parse_product_page_html
+        if not parsed.get('title') or parsed['source_url'] in seen_sources:
+            return
+        seen_sources.add(parsed['source_url'])
+        results.append(parsed)
+
+    # product links found by the BFS are validated by a fixed set of workers pulling from this queue
+    product_queue = asyncio.Queue()
+
+    async def product_worker():
+        while True:
+            pl = await product_queue.get()
+            try:
+                if len(results) < max_products_cap:
+                    parsed = await fetch_and_validate_parse(context_pool, pl, parse_pool=parse_pool, verbose=verbose,
+                                                            cache_dir=cache_dir)
+                    if parsed and len(results) < max_products_cap:
+                        add_result(parsed)
+            except Exception as e:
+                # one bad item must not take the worker down, or product_queue.join() never returns
+                if verbose:
+                    print(f"  ! failed handling product {pl}: {e}")
+            finally:
+                product_queue.task_done()
 
-        if urlparse(url).netloc != urlparse(start_url).netloc:
-            continue
+    def schedule_product(pl):
+        key = product_url_key(pl)
+        if key not in scheduled_products:
+            scheduled_products.add(key)
+            product_queue.put_nowait(pl)
 
-        try:
-            page = await browser.new_page()
-            await page.goto(url, timeout=PAGE_TIMEOUT)
-            await asyncio.sleep(random.uniform(*RANDOM_DELAY))
-            pages_visited += 1
-            html = await page.content()
-
-            # canonical and quick checks
-            canonical = get_canonical(html)
-            prod_block = find_product_block(extract_ld_json(html))
-            og_type = meta_tag(html, prop='og:type') or ""
-
-            url_is_product_like = looks_like_product_url(url)
-            canonical_is_product_like = bool(canonical and looks_like_product_url(canonical))
-
-            # Only treat this visited URL as a candidate product if the URL (or canonical) is product-like.
-            if url_is_product_like or canonical_is_product_like:
-                validate_source = canonical if canonical_is_product_like else url
-                parsed = parse_product_page_html(html, source_url=validate_source)
-                if parsed.get("is_product"):
-                    parsed.pop("is_product", None)
-                    # prefer canonical as source_url when it looks product-like
-                    if canonical_is_product_like:
-                        parsed['source_url'] = canonical
-                    else:
-                        parsed['source_url'] = url
-                    results.append(parsed)
+    workers = [asyncio.create_task(product_worker()) for _ in range(CONCURRENT_PRODUCT_FETCHES)]
+    try:
+        while queue and len(results) < max_products_cap and pages_visited < max_pages_cap:
+            url, depth = queue.popleft()
+
+            if url_netloc(url) != start_netloc:
+                continue
+
+            # known product URLs (e.g. seeded from the start page) don't need rendering
+            # or expanding; the fetch workers take them over HTTP
+            if looks_like_product_url(url):
+                schedule_product(url)
+                continue
+
+            try:
+                await page.goto(url, timeout=PAGE_TIMEOUT, wait_until="domcontentloaded")
+                await asyncio.sleep(random.uniform(*RANDOM_DELAY))
+                pages_visited += 1
+                # DOMContentLoaded comes before the tiles are rendered: click "load more" and
+                # scroll first, so the one snapshot below holds every link
+                expanded = await try_expand_listing(page)
+                html = await page.content()
+
+                # paginated/aliased listings often serve identical HTML; parse and expand it once
+                content_hash = hashlib.blake2b(html.encode('utf-8', 'ignore'), digest_size=16).digest()
+                if content_hash in seen_content:
                     if verbose:
-                        print(json.dumps(parsed, ensure_ascii=False))
+                        print(f"  [BFS] skipping {url}: same content as an earlier page")
+                    continue
+                seen_content.add(content_hash)
+
+                # canonical, the product parse for product-like pages and the links of
+                # listing pages, all from one parse off the event loop
+                parsed, canonical, (hrefs, ld_urls) = await run_parse(parse_pool, parse_bfs_page, html, url,
+                                                                      page.url or url)
+
+                # Product-like URLs never get here (they go to the fetch workers), so a visited
+                # page is only a candidate product if its canonical is product-like.
+                if parsed or (canonical and looks_like_product_url(canonical)):
+                    if parsed:
+                        add_result(parsed)
+                        if verbose:
+                            print(json.dumps(parsed, ensure_ascii=False))
+                    else:
+                        if verbose:
+                            print(f"  - canonical looked product-like but page parsed as non-product: {url} (canonical: {canonical})")
                 else:
-                    if verbose:
-                        print(f"  - page looked product-like by URL but parsed as non-product: {url} (canonical: {canonical})")
-                await page.close()
-            else:
-                # Category/listing page: expand then discover inner links
-                await try_expand_listing(page)
-                inner_links = await discover_links_on_page(page, url)
-
-                # split discovered links into product-like and category-like
-                product_like = [u for u in inner_links if looks_like_product_url(u)]
-                category_like = [u for u in inner_links if '/shop/refurbished/' in u and not looks_like_product_url(u)]
-
-                # prioritize product links (schedule fetch+validate)
-                for pl in product_like:
-                    if pl not in visited:
-                        # schedule concurrent validation-only fetch for pl
-                        task = asyncio.create_task(fetch_and_validate_parse(sem, browser, pl, verbose=verbose))
-                        product_tasks.append(task)
-
-                # enqueue subcategories (increase depth)
-                if depth < MAX_BFS_DEPTH:
-                    for cl in category_like:
-                        if cl not in visited:
-                            queue.append((cl, depth + 1))
+                    # Category/listing page: its (expanded) links are in the snapshot
+                    inner_links = same_origin_links(hrefs, ld_urls, url)
+
+                    # split discovered links into product-like and category-like
+                    product_like = []
+                    category_like = []
+                    for u in inner_links:
+                        if looks_like_product_url(u):
+                            product_like.append(u)
+                        elif '/shop/refurbished/' in u:
+                            category_like.append(u)
+
+                    # prioritize product links (hand them to the fetch+validate workers)
+                    for pl in product_like:
+                        schedule_product(pl)
+
+                    # enqueue subcategories (increase depth)
+                    if depth < MAX_BFS_DEPTH:
+                        for cl in category_like:
+                            if cl not in seen:
+                                seen.add(cl)
+                                queue.append((cl, depth + 1))
 
+                    if verbose:
+                        print(f"  [BFS] visited {url} depth={depth} expanded={expanded} -> links={len(inner_links)} product_like={len(product_like)} category_like={len(category_like)}")
+            except Exception as e:
                 if verbose:
-                    print(f"  [BFS] visited {url} depth={depth} -> links={len(inner_links)} product_like={len(product_like)} category_like={len(category_like)}")
-                await page.close()
-        except Exception as e:
-            if verbose:
-                print(f"  ! failed visiting {url}: {e}")
-            try:
-                await page.close()
-            except:
-                pass
-            continue
-
-        # harvest any finished product tasks quickly
-        if product_tasks:
-            done, pending = await asyncio.wait(product_tasks, timeout=0, return_when=asyncio.ALL_COMPLETED)
-            product_tasks = list(pending)
-            for d in done:
+                    print(f"  ! failed visiting {url}: {e}")
+                # start the next visit from a fresh page in case this one crashed or hung
                 try:
-                    parsed = d.result()
-                    if parsed:
-                        results.append(parsed)
-                        if len(results) >= max_products_cap:
-                            break
-                except Exception:
+                    await page.close()
+                except:
                     pass
+                page = await listing_context.new_page()
+                continue
 
-    # finish any remaining product tasks
-    if product_tasks and len(results) < max_products_cap:
-        done, _ = await asyncio.wait(product_tasks, return_when=asyncio.ALL_COMPLETED)
-        for d in done:
-            try:
-                parsed = d.result()
-                if parsed:
-                    results.append(parsed)
-                    if len(results) >= max_products_cap:
-                        break
-            except Exception:
-                pass
-
-    # Filter out error pages and deduplicate
-    results = [r for r in results if r.get('title') and 
-               not any(x in r['title'].lower() for x in ['page not found', 'page introuvable', 'no se encuentra', 'nicht gefunden'])]
-    
-    # Remove duplicates based on source_url
-    seen_urls = set()
-    unique_results = []
-    for result in results:
-        if result['source_url'] not in seen_urls:
-            seen_urls.add(result['source_url'])
-            unique_results.append(result)
+        # finish any queued product fetches (workers skip the rest once the cap is hit)
+        await product_queue.join()
+    finally:
+        for w in workers:
+            w.cancel()
+        await page.close()
+        if own_listing_context:
+            await own_listing_context.close()
+        if own_contexts:
+            await close_context_pool(own_contexts)
 
-    print(f"[+] {country_tag}: parsed {len(unique_results)} unique products (pages visited: {pages_visited})")
-    return unique_results
+    print(f"[+] {country_tag}: parsed {len(results)} unique products (pages visited: {pages_visited})")
+    return results
 
 
 # ---------- CLI & main ----------
@@ -814,11 +1206,11 @@ async def main_async(args):
                 s = ln.strip()
                 if not s:
                     continue
+                parts = s.split(None, 1)
                 if "\t" in s:
                     tag, url = [x.strip() for x in s.split("\t", 1)]
-                elif " " in s and s.split()[0].isalpha() and len(s.split()[0]) <= 3:
-                    parts = s.split(None, 1)
-                    tag, url = parts[0], parts[1] if len(parts) > 1 else s
+                elif len(parts) == 2 and parts[0].isalpha() and len(parts[0]) <= 3:
+                    tag, url = parts
                 else:
                     parsed = urlparse(s)
                     host = parsed.netloc or "unknown"
@@ -837,31 +1229,61 @@ async def main_async(args):
         return
 
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=not args.show_browser)
-        out = {}
+        browser = await p.chromium.launch(headless=not args.show_browser, args=BROWSER_ARGS)
+        # CPU-bound HTML parsing runs in worker processes alongside the network I/O
+        parse_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+        # one set of long-lived contexts for every country, so keep-alive/TLS sessions are reused
+        context_pool, contexts = await open_context_pool(browser, CONCURRENT_PRODUCT_FETCHES)
+        # and one for the listing pages every country's BFS renders
+        listing_context = await open_listing_context(browser)
         
         # Summary stats for debugging
         total_products = 0
         cpu_stats = {}
         ram_stats = {}
         
-        for tag, url in start_map.items():
-            prods = await crawl_country_bfs(tag, url, browser, max_per_country=(args.max_per_country or 0),
-                                            max_pages=(args.max_pages or 0), verbose=args.verbose)
-            out[tag] = prods
-            total_products += len(prods)
-            
-            # Collect stats for debugging
-            for prod in prods:
-                if prod.get('chip'):
-                    cpu_stats[prod['chip']] = cpu_stats.get(prod['chip'], 0) + 1
-                if prod.get('ram'):
-                    ram_stats[prod['ram']] = ram_stats.get(prod['ram'], 0) + 1
-                    
-            time.sleep(random.uniform(*RANDOM_DELAY))
-
+        # countries are independent, so crawl them all at once; the shared context pool
+        # still bounds how many product fetches are in flight overall
+        async def crawl_country(tag, url):
+            # a failing storefront shouldn't take the other countries' crawls down with it
+            try:
+                prods = await crawl_country_bfs(tag, url, browser, max_per_country=(args.max_per_country or 0),
+                                                max_pages=(args.max_pages or 0), verbose=args.verbose,
+                                                parse_pool=parse_pool, context_pool=context_pool,
+                                                cache_dir=None if args.no_cache else CACHE_DIR,
+                                                listing_context=listing_context)
+            except Exception as e:
+                print(f"  ! {tag}: crawl failed: {e}")
+                prods = []
+            return tag, prods
+
+        # each finished country is appended to a JSONL file right away, so a crash or
+        # interrupt keeps whatever was crawled so far
         out_path = Path(args.output)
-        out_path.write_text(json.dumps(out, ensure_ascii=False, indent=2), encoding="utf-8")
+        jsonl_path = out_path.with_name(out_path.name + ".jsonl")
+        with jsonl_path.open("wb") as fp:
+            for next_country in asyncio.as_completed([crawl_country(tag, url) for tag, url in start_map.items()]):
+                tag, prods = await next_country
+                for prod in prods:
+                    fp.write(json_dumps({'country': tag, **prod}))
+                    fp.write(b"\n")
+                fp.flush()
+                total_products += len(prods)
+
+                # Collect stats for debugging
+                for prod in prods:
+                    if prod.get('chip'):
+                        cpu_stats[prod['chip']] = cpu_stats.get(prod['chip'], 0) + 1
+                    if prod.get('ram'):
+                        ram_stats[prod['ram']] = ram_stats.get(prod['ram'], 0) + 1
+
+        # the viewer expects {country: [products]}, grouped back from the JSONL in start-map order
+        out = {tag: [] for tag in start_map}
+        with jsonl_path.open("rb") as fp:
+            for line in fp:
+                prod = json_loads(line)
+                out[prod.pop('country')].append(prod)
+        out_path.write_bytes(dump_output_json(out))
         
         print(f"\n[SUMMARY]")
         print(f"Total products: {total_products}")
@@ -878,7 +1300,9 @@ async def main_async(args):
             for ram, count in sorted(ram_stats.items(), key=lambda x: int(x[0].replace('GB', '')))[:10]:
                 print(f"  {ram}: {count}")
         
-        print(f"\nSaved: {out_path.resolve()}")
+        print(f"\nSaved: {out_path.resolve()} (per-product lines: {jsonl_path.name})")
+        await close_context_pool(contexts + [listing_context])
+        parse_pool.shutdown()
         await browser.close()
 
 
@@ -891,12 +1315,16 @@ def parse_cli():
     p.add_argument("--max-pages", type=int, default=0, help="Limit listing/category pages per country (0=default cap)")
     p.add_argument("--verbose", action="store_true", help="Print parsed product objects as they are parsed and BFS logs")
     p.add_argument("--show-browser", action="store_true", help="Show browser window (non-headless) for debugging")
+    p.add_argument("--no-cache", action="store_true",
+                   help=f"Don't read or write the parsed-product cache ({CACHE_DIR}, {CACHE_TTL // 3600}h TTL)")
     return p.parse_args()
 
 
 if __name__ == "__main__":
     args = parse_cli()
+    # uvloop.run creates its loop directly; the global-policy uvloop.install() is deprecated
+    run = uvloop.run if uvloop is not None else asyncio.run
     try:
-        asyncio.run(main_async(args))
+        run(main_async(args))
     except KeyboardInterrupt:
         print("Interrupted by user")
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""Regression tests for apl.py; run with `python -m unittest discover tests` from the repo root."""
+
+import asyncio
+import unittest
+
+import apl
+
+BASE = "https://www.apple.com"
+START = BASE + "/shop/refurbished"
+CATEGORY = START + "/mac"
+PRODUCT = BASE + "/shop/product/FG123LL/A/refurbished-macbook-air"
+
+PRODUCT_HTML = """<html><head>
+<meta property="og:url" content="%s">
+<script type="application/ld+json">{"@type": "Product", "name": "Refurbished MacBook Air 13-inch Apple M2 Chip",
+ "image": "https://img/mba.jpg", "offers": {"price": 999, "priceCurrency": "USD"}}</script>
+</head><body></body></html>""" % PRODUCT
+
+
+def listing_html(hrefs):
+    anchors = "".join('<a href="%s">x</a>' % h for h in hrefs)
+    return "<html><head><title>Refurbished</title></head><body>%s</body></html>" % anchors
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.status = 200 if body is not None else 404
+        self.ok = body is not None
+        self.headers = {}
+        self._body = body
+
+    async def text(self):
+        return self._body
+
+    async def dispose(self):
+        pass
+
+
+class FakeRequest:
+    def __init__(self, site):
+        self.site = site
+
+    async def get(self, url, **kw):
+        return FakeResponse(self.site.get(url))
+
+
+class FakeLocator:
+    def filter(self, **kw):
+        return self
+
+    @property
+    def first(self):
+        return self
+
+    async def count(self):
+        return 0
+
+
+class FakePage:
+    """Serves `dom_loaded` HTML until the page is scrolled, then `hydrated` HTML if any."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.url = None
+        self.scrolled = False
+
+    async def goto(self, url, **kw):
+        self.url, self.scrolled = url, False
+
+    async def content(self):
+        dom_loaded, hydrated = self.pages[self.url]
+        return hydrated if self.scrolled and hydrated else dom_loaded
+
+    async def evaluate(self, script, *args):
+        if "scrollBy" in script:
+            self.scrolled = True
+
+    def locator(self, selector):
+        return FakeLocator()
+
+    async def close(self):
+        pass
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.request = FakeRequest(browser.products)
+
+    async def route(self, *args):
+        pass
+
+    async def route_web_socket(self, *args):
+        pass
+
+    async def new_page(self):
+        return FakePage(self.browser.pages)
+
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    def __init__(self, pages, products):
+        self.pages, self.products = pages, products
+
+    async def new_context(self, **kw):
+        return FakeContext(self)
+
+
+class ChipRankTest(unittest.TestCase):
+    def chip(self, text):
+        return apl.find_ram_storage_chip(text)["chip"]
+
+    def test_newer_generation_wins_within_a_family(self):
+        self.assertEqual(self.chip("iPhone 16 Pro with A18 Pro chip, up to 20% faster than A17 Pro"), "A18 Pro")
+        self.assertEqual(self.chip("A16 Bionic vs A15 Bionic"), "A16")
+
+    def test_variant_beats_base_chip(self):
+        self.assertEqual(self.chip("Apple M3 Pro chip with 18GB unified memory. Faster than M3."), "M3 Pro")
+
+
+class ProductPageTest(unittest.TestCase):
+    def test_image_and_specs_without_price_is_a_product(self):
+        html = """<html><head><meta property="og:title" content="Refurbished Mac mini">
+<meta property="og:image" content="https://img/mini.jpg">
+<meta property="og:description" content="Apple M2 chip, 16GB unified memory, 512GB SSD storage">
+</head><body></body></html>"""
+        parsed = apl.parse_product_page_html(html, source_url=START + "/mac-mini")
+        self.assertTrue(parsed["is_product"])
+        self.assertEqual((parsed["chip"], parsed["ram"], parsed["storage"]), ("M2", "16GB", "512GB"))
+
+    def test_listing_without_product_signals_is_not_a_product(self):
+        html = listing_html(["/shop/refurbished/mac"])
+        self.assertFalse(apl.parse_product_page_html(html, source_url=START)["is_product"])
+
+
+class CrawlTest(unittest.TestCase):
+    def setUp(self):
+        self._delay = apl.RANDOM_DELAY
+        apl.RANDOM_DELAY = (0, 0)
+
+    def tearDown(self):
+        apl.RANDOM_DELAY = self._delay
+
+    def test_links_rendered_after_domcontentloaded_are_followed(self):
+        # the category's product tile only exists once its scripts have run
+        pages = {
+            START: (listing_html(["/shop/refurbished/mac"]), None),
+            CATEGORY: (listing_html([]), listing_html(["/shop/product/FG123LL/A/refurbished-macbook-air"])),
+        }
+        browser = FakeBrowser(pages, {PRODUCT: PRODUCT_HTML})
+        results = asyncio.run(apl.crawl_country_bfs("US", START, browser))
+        self.assertEqual([r["source_url"] for r in results], [PRODUCT])
+
+
+if __name__ == "__main__":
+    unittest.main()